@@ -11,15 +11,93 @@ Usage in notebook:
     api_keys = load_all_api_keys()
 """
 
+import importlib.util
+import io
 import os
+import sys
+from contextlib import redirect_stdout
+from functools import lru_cache
+
+from setup_helper import is_colab_environment
+
+# Resolved once at import; the environment cannot change mid-session
+_IN_COLAB = is_colab_environment()
 
 # Placeholder values that are invalid
-INVALID_PLACEHOLDERS = [
+INVALID_PLACEHOLDERS = frozenset({
     'your_client_api_token_here', 'your_client_token_here',
     'your_indexing_api_token_here', 'your_indexing_token_here',
     'your_api_token_here', 'your_token_here', 'your_key_here',
     'paste_your_token_here', 'add_your_token_here'
-]
+})
+
+# Keys found during this session, keyed by environment variable name.
+# Lets load_all_api_keys() be re-run without re-probing or re-prompting
+# for keys it already has; missing keys are probed again each time.
+_KEY_CACHE = {}
+
+# Extra .env locations, loaded in order after the nearest .env found by
+# dotenv.find_dotenv() (later files override earlier ones)
+DOTENV_PATHS = ['../.env', '../../.env']
+
+# Separator lines for the printed report
+_BANNER = "=" * 60
+_NL_BANNER = "\n" + _BANNER
+
+# Display names for each key source, used in status messages
+_SOURCE_NAMES = {
+    'colab': 'Google Colab', 'env_file': '.env file',
+    'env_var': 'environment variable', 'manual': 'manual input'
+}
+
+# Same, phrased as a location ("configured in ...")
+_SOURCE_LOCATIONS = {
+    'colab': 'Google Colab', 'env_file': 'your .env file',
+    'env_var': 'environment variables', 'manual': 'manual input'
+}
+
+# Setup steps shown when no keys were found, for each environment
+_COLAB_SETUP_GUIDE = """
+🌐 You're in Google Colab. Set up your keys:
+   1. Click the 🔑 key icon in the left sidebar
+   2. Click '+ Add new secret'
+   3. Add BOTH secrets:
+      • Name: GLEAN-CLIENT-API  → Value: [your client token]
+      • Name: GLEAN-INDEX-API   → Value: [your indexing token]
+   4. Enable 'Notebook access' for both"""
+
+_LOCAL_SETUP_GUIDE = """
+💻 You're in a local environment. Set up your .env file:
+   1. Create a file named '.env' in the project root
+   2. Add BOTH lines:
+      GLEAN_CLIENT_API=your_client_token_here
+      GLEAN_INDEX_API=your_indexing_token_here
+   3. Replace the placeholder values with your actual tokens"""
+
+# Steps for adding a missing key, keyed by where the other key was found.
+# Formatted with the missing key's secret_name, env_name and token description.
+_MISSING_KEY_INSTRUCTIONS = {
+    'colab': """
+🌐 Add the missing key to Google Colab:
+   1. Click the 🔑 key icon in the left sidebar
+   2. Click '+ Add new secret'
+   3. Add: Name: {secret_name}  → Value: [your {token} token]
+   4. Enable 'Notebook access'""",
+    'env_file': """
+💻 Add the missing key to your .env file:
+   1. Open your .env file
+   2. Add this line: {env_name}=your_{token}_token_here
+   3. Replace the placeholder with your actual token""",
+}
+
+# Whether python-dotenv is installed (checked without importing it)
+_HAS_DOTENV = importlib.util.find_spec('dotenv') is not None
+
+# python-dotenv module, imported lazily by _get_dotenv()
+_dotenv_mod = None
+
+# Modification times of the .env files as of their last load, keyed by path
+_env_mtime = {}
 
 
 def is_valid_key(key):
@@ -32,10 +110,18 @@ def is_valid_key(key):
     Returns:
         bool: True if key is valid, False if empty or placeholder
     """
-    if not key or not key.strip():
-        return False
+    key = key.strip() if key else key
+    return bool(key) and _is_valid_key_fast(key)
+
+
+@lru_cache(maxsize=32)
+def _is_valid_key_fast(key):
+    """
+    Same as is_valid_key, for a key that is already stripped and non-empty.
     
-    key_lower = key.strip().lower()
+    Results are cached, since the same few keys are checked repeatedly.
+    """
+    key_lower = key.lower()
     
     # Check against known placeholder patterns
     if key_lower in INVALID_PLACEHOLDERS:
@@ -48,6 +134,162 @@ def is_valid_key(key):
     return True
 
 
+def _get_dotenv():
+    """
+    Import python-dotenv on first use and reuse the module afterwards.
+    
+    Returns:
+        module or None: The dotenv module, or None if it is not installed
+    """
+    global _dotenv_mod
+    if _dotenv_mod is None and _HAS_DOTENV:
+        import dotenv as _dotenv_mod
+    return _dotenv_mod
+
+
+def _ensure_dotenv_loaded():
+    """
+    Load the .env files into os.environ.
+    
+    Files are only re-read when one of them has been modified since the last
+    load, so this is cheap to call repeatedly. Missing files are skipped.
+    
+    Returns:
+        bool: True if the .env files were (re)loaded, False otherwise
+    """
+    dotenv = _get_dotenv()
+    if dotenv is None:
+        return False
+    
+    # Nearest .env in the working directory or any parent, as load_dotenv() finds it
+    candidates = [dotenv.find_dotenv(usecwd=True), *DOTENV_PATHS]
+    
+    mtimes = {}
+    for path in candidates:
+        if not path:
+            continue
+        try:
+            mtimes[path] = os.stat(path).st_mtime
+        except OSError:
+            continue
+    
+    if mtimes == _env_mtime:
+        return False
+    
+    # Reload every file, in order, so later files still take precedence
+    # Use override=True to prioritize .env values over cached environment variables
+    for path in mtimes:
+        try:
+            dotenv.load_dotenv(dotenv_path=path, override=True)
+        except FileNotFoundError:
+            # Removed after it was checked above
+            continue
+    
+    _env_mtime.clear()
+    _env_mtime.update(mtimes)
+    return True
+
+
+def _read_colab(colab_secret_name, placeholder_sources):
+    """
+    Read a key from Google Colab secrets.
+    
+    Returns:
+        str or None: The stripped key, or None if missing or a placeholder
+                     (placeholders are recorded in placeholder_sources)
+    """
+    try:
+        from google.colab import userdata
+        api_key = userdata.get(colab_secret_name)
+        if api_key:
+            api_key = api_key.strip()
+            if api_key and _is_valid_key_fast(api_key):
+                return api_key
+            placeholder_sources.append('colab')
+    except Exception as e:
+        print(f"⚠️  Could not access Colab secret '{colab_secret_name}': {e}")
+    return None
+
+
+def _read_env(key_name, placeholder_sources):
+    """
+    Read a key from .env files, then from environment variables.
+    
+    Returns:
+        Tuple of (api_key, source, placeholder_sources), as for _probe_api_key
+    """
+    # Try .env file (local development)
+    if _HAS_DOTENV:
+        _ensure_dotenv_loaded()
+        
+        api_key = os.environ.get(key_name)
+        if api_key:
+            api_key = api_key.strip()
+            if api_key and _is_valid_key_fast(api_key):
+                return (api_key, 'env_file', tuple(placeholder_sources))
+            placeholder_sources.append('env_file')
+    
+    # Try system environment variables
+    api_key = os.environ.get(key_name)
+    if api_key:
+        api_key = api_key.strip()
+        if api_key and _is_valid_key_fast(api_key):
+            return (api_key, 'env_var', tuple(placeholder_sources))
+        placeholder_sources.append('env_var')
+    
+    return (None, None, tuple(placeholder_sources))
+
+
+def _make_loader(key_name, colab_secret_name):
+    """
+    Build a probe for one key, with the Colab check resolved up front.
+    
+    Returns:
+        callable: Takes no arguments and returns (api_key, source, placeholder_sources)
+    """
+    if _IN_COLAB:
+        def loader():
+            placeholder_sources = []
+            # Try Google Colab secrets first
+            api_key = _read_colab(colab_secret_name, placeholder_sources)
+            if api_key:
+                return (api_key, 'colab', tuple(placeholder_sources))
+            return _read_env(key_name, placeholder_sources)
+    else:
+        def loader():
+            return _read_env(key_name, [])
+    return loader
+
+
+# Probes for the two keys used by load_all_api_keys, built once at import
+_load_client_key = _make_loader('GLEAN_CLIENT_API', 'GLEAN-CLIENT-API')
+_load_index_key = _make_loader('GLEAN_INDEX_API', 'GLEAN-INDEX-API')
+
+_LOADERS = {
+    ('GLEAN_CLIENT_API', 'GLEAN-CLIENT-API'): _load_client_key,
+    ('GLEAN_INDEX_API', 'GLEAN-INDEX-API'): _load_index_key,
+}
+
+
+def _probe_api_key(key_name, colab_secret_name):
+    """
+    Probe Colab secrets, .env files and environment variables for a key.
+    Keys are returned with surrounding whitespace stripped.
+    
+    Nothing is cached here, so a key added after a miss is found on the next
+    call; get_api_key keeps keys that were found in _KEY_CACHE. User-facing
+    messages are left to get_api_key.
+    
+    Returns:
+        Tuple of (api_key, source, placeholder_sources) where placeholder_sources
+        lists every source that held placeholder text instead of a real token
+    """
+    loader = _LOADERS.get((key_name, colab_secret_name))
+    if loader is None:
+        loader = _make_loader(key_name, colab_secret_name)
+    return loader()
+
+
 def get_api_key(key_name, colab_secret_name=None, required=True):
     """
     Universal API key loader that works across all environments.
@@ -58,6 +300,10 @@ def get_api_key(key_name, colab_secret_name=None, required=True):
     3. Environment variables
     4. Manual input (fallback if required=True)
     
+    Keys that were found are remembered for the rest of the session, so
+    calling this again does not re-read the environment or prompt again,
+    unless a .env file has been edited in the meantime.
+    
     Args:
         key_name: Name of the environment variable (e.g., 'GLEAN_CLIENT_API')
         colab_secret_name: Name in Colab secrets (defaults to key_name with underscores→hyphens)
@@ -70,57 +316,43 @@ def get_api_key(key_name, colab_secret_name=None, required=True):
     if colab_secret_name is None:
         colab_secret_name = key_name.replace('_', '-')
     
-    found_placeholder = False
+    # Re-probe if a .env file was edited since the last call
+    # (keys entered manually are kept)
+    if _HAS_DOTENV and _ensure_dotenv_loaded():
+        for name, (_, source) in list(_KEY_CACHE.items()):
+            if source != 'manual':
+                del _KEY_CACHE[name]
     
-    # Try Google Colab secrets first
-    try:
-        from google.colab import userdata
-        api_key = userdata.get(colab_secret_name)
-        if api_key and is_valid_key(api_key):
-            print(f"✅ Loaded {key_name} from Google Colab secrets")
-            return (api_key, 'colab')
-        elif api_key and not is_valid_key(api_key):
+    if key_name in _KEY_CACHE:
+        api_key, source = _KEY_CACHE[key_name]
+        print(f"✅ Using {key_name} loaded earlier in this session")
+        return (api_key, source)
+    
+    api_key, source, placeholder_sources = _probe_api_key(key_name, colab_secret_name)
+    
+    for placeholder_source in placeholder_sources:
+        if placeholder_source == 'colab':
             print(f"❌ {key_name} in Colab secrets contains placeholder text")
             print(f"   Please replace it with your actual API token")
-            found_placeholder = True
-    except ImportError:
-        pass
-    except Exception as e:
-        print(f"⚠️  Could not access Colab secret '{colab_secret_name}': {e}")
-    
-    # Try .env file (local development)
-    try:
-        from dotenv import load_dotenv
-        
-        # Look for .env in multiple locations
-        # Use override=True to prioritize .env values over cached environment variables
-        load_dotenv(override=True)
-        load_dotenv(dotenv_path='../.env', override=True)
-        load_dotenv(dotenv_path='../../.env', override=True)
-        
-        api_key = os.getenv(key_name)
-        if api_key and is_valid_key(api_key):
-            print(f"✅ Loaded {key_name} from .env file")
-            return (api_key, 'env_file')
-        elif api_key and not is_valid_key(api_key):
-            print(f"❌ {key_name} in .env file contains placeholder text: '{api_key}'")
+        elif placeholder_source == 'env_file':
+            print(f"❌ {key_name} in .env file contains placeholder text: '{os.environ.get(key_name)}'")
             print(f"   Please replace it with your actual API token in your .env file")
-            found_placeholder = True
-    except Exception as e:
-        pass
+        else:
+            print(f"❌ {key_name} environment variable contains placeholder text")
+            print(f"   Please set it to your actual API token")
     
-    # Try system environment variables
-    api_key = os.environ.get(key_name)
-    if api_key and is_valid_key(api_key):
-        print(f"✅ Loaded {key_name} from environment variables")
-        return (api_key, 'env_var')
-    elif api_key and not is_valid_key(api_key):
-        print(f"❌ {key_name} environment variable contains placeholder text")
-        print(f"   Please set it to your actual API token")
-        found_placeholder = True
+    if api_key:
+        if source == 'colab':
+            print(f"✅ Loaded {key_name} from Google Colab secrets")
+        elif source == 'env_file':
+            print(f"✅ Loaded {key_name} from .env file")
+        else:
+            print(f"✅ Loaded {key_name} from environment variables")
+        _KEY_CACHE[key_name] = (api_key, source)
+        return (api_key, source)
     
     # If we found a placeholder, don't prompt - user needs to fix their config
-    if found_placeholder:
+    if placeholder_sources:
         return (None, None)  # Return tuple with None values
     
     # If not found and required, prompt for manual input
@@ -136,6 +368,7 @@ def get_api_key(key_name, colab_secret_name=None, required=True):
             
             if api_key and is_valid_key(api_key):
                 print(f"✅ Using manually entered {key_name}")
+                _KEY_CACHE[key_name] = (api_key, 'manual')
                 return (api_key, 'manual')
             elif api_key:
                 print(f"⚠️  The value you entered appears to be a placeholder")
@@ -150,6 +383,74 @@ def get_api_key(key_name, colab_secret_name=None, required=True):
     return (None, None)
 
 
+def _print_no_keys(status):
+    """Print setup steps when neither API key was found."""
+    print("\n❌ ERROR: No API keys configured")
+    print("\n📖 Setup Guide:")
+    # Detect if likely in Colab or local
+    print(_COLAB_SETUP_GUIDE if _IN_COLAB else _LOCAL_SETUP_GUIDE)
+    print("\n🔄 After setup, restart the kernel and run this cell again")
+    print(_BANNER)
+
+
+def _print_missing_key(status):
+    """Print steps for adding the missing key when only one key was found."""
+    found_name, _, _, found_source = next(entry for entry in status if entry[2])
+    missing_name, missing_token, _, _ = next(entry for entry in status if not entry[2])
+    
+    print(f"\n⚠️  WARNING: Missing {missing_name}")
+    print(f"\n💡 You have {found_name} configured in {_SOURCE_LOCATIONS.get(found_source, 'unknown')}")
+    
+    instructions = _MISSING_KEY_INSTRUCTIONS.get(found_source)
+    if instructions:
+        print(instructions.format(
+            secret_name=missing_name,
+            env_name=missing_name.replace('-', '_'),
+            token=missing_token,
+        ))
+    
+    print("\n🔄 After adding the key, restart the kernel and run this cell again")
+    print(_BANNER)
+
+
+def _print_mixed_sources(status):
+    """Print a warning when the two keys were loaded from different sources."""
+    sources = [source for _, _, _, source in status]
+    
+    print("\n⚠️  WARNING: API keys are configured in different locations!")
+    print()
+    for secret_name, _, _, source in status:
+        print(f"   • {secret_name}: {_SOURCE_NAMES.get(source, 'unknown')}")
+    print("\n💡 For better organization, use ONE configuration method:")
+    
+    if 'colab' in sources:
+        print("\n🌐 Option A - Use Google Colab secrets (recommended for Colab):")
+        print("   Move both keys to Colab secrets")
+    
+    if 'env_file' in sources:
+        print("\n💻 Option B - Use .env file (recommended for local):")
+        print("   Move both keys to your .env file")
+    
+    print("\n🔄 After consolidating, restart the kernel and run this cell again")
+    print(_BANNER)
+
+
+def _print_all_good(status):
+    """Print the success message when both keys came from the same source."""
+    print("\n🎉 All API keys loaded successfully! Ready to proceed.")
+    print(_BANNER)
+
+
+# Report printer for each (client key found, index key found, same source) state
+_DISPATCH = {
+    (False, False, True): _print_no_keys,
+    (True, False, False): _print_missing_key,
+    (False, True, False): _print_missing_key,
+    (True, True, False): _print_mixed_sources,
+    (True, True, True): _print_all_good,
+}
+
+
 def load_all_api_keys():
     """
     Load all required API keys for the Glean lab.
@@ -162,9 +463,9 @@ def load_all_api_keys():
         dict: Dictionary with 'client' and 'index' keys containing API tokens
               (or None if not found)
     """
-    print("=" * 60)
+    print(_BANNER)
     print("🔐 LOADING GLEAN API KEYS")
-    print("=" * 60)
+    print(_BANNER)
     
     # Load both required keys (returns tuple of (key, source))
     client_key, client_source = get_api_key('GLEAN_CLIENT_API', 'GLEAN-CLIENT-API', required=True)
@@ -176,117 +477,31 @@ def load_all_api_keys():
         'index': index_key
     }
     
-    # Validation summary
-    print("\n" + "=" * 60)
-    print("📋 API KEY STATUS SUMMARY")
-    print("=" * 60)
-    
-    if client_key:
-        source_map = {'colab': 'Google Colab', 'env_file': '.env file', 'env_var': 'environment variable', 'manual': 'manual input'}
-        source_name = source_map.get(client_source, 'unknown')
-        print(f"✅ GLEAN-CLIENT-API: Loaded from {source_name}")
-    else:
-        print("❌ GLEAN-CLIENT-API: NOT FOUND")
-    
-    if index_key:
-        source_map = {'colab': 'Google Colab', 'env_file': '.env file', 'env_var': 'environment variable', 'manual': 'manual input'}
-        source_name = source_map.get(index_source, 'unknown')
-        print(f"✅ GLEAN-INDEX-API: Loaded from {source_name}")
-    else:
-        print("❌ GLEAN-INDEX-API: NOT FOUND")
-    
-    print("=" * 60)
+    # (Colab secret name, token description, key, source) for each key
+    status = [
+        ('GLEAN-CLIENT-API', 'client', client_key, client_source),
+        ('GLEAN-INDEX-API', 'indexing', index_key, index_source),
+    ]
     
-    # Smart messaging based on key sources
-    if not client_key and not index_key:
-        # CASE 1: No keys found
-        print("\n❌ ERROR: No API keys configured")
-        print("\n📖 Setup Guide:")
-        # Detect if likely in Colab or local
-        try:
-            import google.colab
-            print("\n🌐 You're in Google Colab. Set up your keys:")
-            print("   1. Click the 🔑 key icon in the left sidebar")
-            print("   2. Click '+ Add new secret'")
-            print("   3. Add BOTH secrets:")
-            print("      • Name: GLEAN-CLIENT-API  → Value: [your client token]")
-            print("      • Name: GLEAN-INDEX-API   → Value: [your indexing token]")
-            print("   4. Enable 'Notebook access' for both")
-        except ImportError:
-            print("\n💻 You're in a local environment. Set up your .env file:")
-            print("   1. Create a file named '.env' in the project root")
-            print("   2. Add BOTH lines:")
-            print("      GLEAN_CLIENT_API=your_client_token_here")
-            print("      GLEAN_INDEX_API=your_indexing_token_here")
-            print("   3. Replace the placeholder values with your actual tokens")
-        print("\n🔄 After setup, restart the kernel and run this cell again")
-        print("=" * 60)
-    
-    elif client_key and not index_key:
-        # CASE 2: Only client key found
-        print(f"\n⚠️  WARNING: Missing GLEAN-INDEX-API")
-        source_map = {'colab': 'Google Colab', 'env_file': 'your .env file', 'env_var': 'environment variables'}
-        print(f"\n💡 You have GLEAN-CLIENT-API configured in {source_map.get(client_source, 'unknown')}")
+    # Buffer the report and write it to stdout once, rather than line by line
+    report = io.StringIO()
+    with redirect_stdout(report):
+        # Validation summary
+        print(_NL_BANNER)
+        print("📋 API KEY STATUS SUMMARY")
+        print(_BANNER)
         
-        if client_source == 'colab':
-            print("\n🌐 Add the missing key to Google Colab:")
-            print("   1. Click the 🔑 key icon in the left sidebar")
-            print("   2. Click '+ Add new secret'")
-            print("   3. Add: Name: GLEAN-INDEX-API  → Value: [your indexing token]")
-            print("   4. Enable 'Notebook access'")
-        elif client_source == 'env_file':
-            print("\n💻 Add the missing key to your .env file:")
-            print("   1. Open your .env file")
-            print("   2. Add this line: GLEAN_INDEX_API=your_indexing_token_here")
-            print("   3. Replace the placeholder with your actual token")
-        
-        print("\n🔄 After adding the key, restart the kernel and run this cell again")
-        print("=" * 60)
-    
-    elif index_key and not client_key:
-        # CASE 3: Only index key found
-        print(f"\n⚠️  WARNING: Missing GLEAN-CLIENT-API")
-        source_map = {'colab': 'Google Colab', 'env_file': 'your .env file', 'env_var': 'environment variables'}
-        print(f"\n💡 You have GLEAN-INDEX-API configured in {source_map.get(index_source, 'unknown')}")
-        
-        if index_source == 'colab':
-            print("\n🌐 Add the missing key to Google Colab:")
-            print("   1. Click the 🔑 key icon in the left sidebar")
-            print("   2. Click '+ Add new secret'")
-            print("   3. Add: Name: GLEAN-CLIENT-API  → Value: [your client token]")
-            print("   4. Enable 'Notebook access'")
-        elif index_source == 'env_file':
-            print("\n💻 Add the missing key to your .env file:")
-            print("   1. Open your .env file")
-            print("   2. Add this line: GLEAN_CLIENT_API=your_client_token_here")
-            print("   3. Replace the placeholder with your actual token")
-        
-        print("\n🔄 After adding the key, restart the kernel and run this cell again")
-        print("=" * 60)
-    
-    elif client_source != index_source:
-        # CASE 4: Keys from different sources (MIXED!)
-        print("\n⚠️  WARNING: API keys are configured in different locations!")
-        source_map = {'colab': 'Google Colab', 'env_file': '.env file', 'env_var': 'environment variable'}
-        print(f"\n   • GLEAN-CLIENT-API: {source_map.get(client_source, 'unknown')}")
-        print(f"   • GLEAN-INDEX-API: {source_map.get(index_source, 'unknown')}")
-        print("\n💡 For better organization, use ONE configuration method:")
-        
-        if 'colab' in [client_source, index_source]:
-            print("\n🌐 Option A - Use Google Colab secrets (recommended for Colab):")
-            print("   Move both keys to Colab secrets")
+        for secret_name, _, key, source in status:
+            if key:
+                print(f"✅ {secret_name}: Loaded from {_SOURCE_NAMES.get(source, 'unknown')}")
+            else:
+                print(f"❌ {secret_name}: NOT FOUND")
         
-        if 'env_file' in [client_source, index_source]:
-            print("\n💻 Option B - Use .env file (recommended for local):")
-            print("   Move both keys to your .env file")
+        print(_BANNER)
         
-        print("\n🔄 After consolidating, restart the kernel and run this cell again")
-        print("=" * 60)
-    
-    else:
-        # CASE 5: Both keys found from same source
-        print("\n🎉 All API keys loaded successfully! Ready to proceed.")
-        print("=" * 60)
+        # Smart messaging based on key sources
+        state = (bool(client_key), bool(index_key), client_source == index_source)
+        _DISPATCH[state](status)
+    sys.stdout.write(report.getvalue())
     
     return keys
-
@@ -13,12 +13,29 @@ Usage in notebook:
 import sys
 import subprocess
 import os
+import importlib.util
+from functools import cache
 
+# Directory containing this script
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Required pip packages mapped to the module name each one provides
+_PKG_TO_IMPORT = {
+    'requests': 'requests',
+    'python-dotenv': 'dotenv',
+    'ipykernel': 'ipykernel',
+    'black': 'black',
+    'ruff': 'ruff',
+}
+
+
+@cache
 def is_colab_environment():
     """
     Detect if running in Google Colab environment.
     
+    The result is cached, since the environment cannot change mid-session.
+    
     Returns:
         bool: True if in Colab, False otherwise
     """
@@ -29,9 +46,35 @@ def is_colab_environment():
         return False
 
 
+# Resolved once at import; the environment cannot change mid-session
+_IN_COLAB = is_colab_environment()
+
+
+def _pip_install(*args):
+    """
+    Run a quiet pip install with the current interpreter.
+    
+    Returns:
+        bool: True if pip succeeded, False otherwise
+    """
+    try:
+        subprocess.check_call(
+            [sys.executable, "-m", "pip", "install", "-q", *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+
 def install_packages_individually(packages):
     """
-    Install packages one by one using pip.
+    Install packages using pip.
+    
+    All packages are first installed in a single pip run. If that fails,
+    each package is retried on its own so one bad package doesn't block
+    the rest.
     
     Args:
         packages: List of package names to install
@@ -39,18 +82,21 @@ def install_packages_individually(packages):
     Returns:
         tuple: (success_count, failure_count)
     """
+    if not packages:
+        return 0, 0
+    
+    # Fast path: one pip run resolves and installs everything together
+    if _pip_install(*packages):
+        return len(packages), 0
+    
     success = 0
     failed = 0
     
+    # One at a time: pip doesn't support concurrent installs into one environment
     for package in packages:
-        try:
-            subprocess.check_call(
-                [sys.executable, "-m", "pip", "install", "-q", package],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
+        if _pip_install(package):
             success += 1
-        except subprocess.CalledProcessError:
+        else:
             failed += 1
             print(f"⚠️  Warning: Could not install {package}")
     
@@ -67,32 +113,24 @@ def install_from_requirements(requirements_path):
     Returns:
         bool: True if successful, False otherwise
     """
-    try:
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "-q", "-r", requirements_path],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    return _pip_install("-r", requirements_path)
 
 
+@cache
 def find_requirements_file():
     """
     Search for requirements.txt in common locations.
     
+    The result is cached for the rest of the session.
+    
     Returns:
         str or None: Path to requirements.txt if found, None otherwise
     """
-    # Get the directory of this script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
     # Check common locations
     possible_paths = [
-        os.path.join(current_dir, '..', 'requirements.txt'),  # Parent directory
-        os.path.join(current_dir, 'requirements.txt'),         # Same directory
-        os.path.join(current_dir, '..', '..', 'requirements.txt'),  # Two levels up
+        os.path.join(_SCRIPT_DIR, '..', 'requirements.txt'),  # Parent directory
+        os.path.join(_SCRIPT_DIR, 'requirements.txt'),         # Same directory
+        os.path.join(_SCRIPT_DIR, '..', '..', 'requirements.txt'),  # Two levels up
     ]
     
     for path in possible_paths:
@@ -109,24 +147,27 @@ def install_requirements():
     
     This is the main function called from the notebook.
     """
-    # Detect environment
-    IN_COLAB = is_colab_environment()
-    
-    if IN_COLAB:
+    if _IN_COLAB:
         print("🔍 Detected Google Colab environment")
     else:
         print("🔍 Detected local environment (VSCode/Cursor)")
     
-    # Define required packages
-    required_packages = ['requests', 'python-dotenv', 'ipykernel', 'black', 'ruff']
+    # Only packages that can't already be imported need installing
+    missing_packages = [
+        package for package, module in _PKG_TO_IMPORT.items()
+        if importlib.util.find_spec(module) is None
+    ]
     
-    if IN_COLAB:
-        # In Colab, install packages directly
-        print("📦 Installing required packages...")
-        success, failed = install_packages_individually(required_packages)
-        
-        if failed > 0:
-            print(f"⚠️  {failed} package(s) failed to install")
+    if _IN_COLAB:
+        if not missing_packages:
+            print("✅ All required packages are already installed")
+        else:
+            # In Colab, install packages directly
+            print("📦 Installing required packages...")
+            success, failed = install_packages_individually(missing_packages)
+            
+            if failed > 0:
+                print(f"⚠️  {failed} package(s) failed to install")
         
     else:
         # In local environment, try requirements.txt first
@@ -138,11 +179,11 @@ def install_requirements():
                 print("✅ Installed from requirements.txt")
             else:
                 print("⚠️  requirements.txt installation failed, trying individual packages...")
-                success, failed = install_packages_individually(required_packages)
+                success, failed = install_packages_individually(missing_packages)
         else:
             # Fallback to individual packages
             print("📦 Installing required packages...")
-            success, failed = install_packages_individually(required_packages)
+            success, failed = install_packages_individually(missing_packages)
     
     print("✅ Setup complete! All dependencies installed.")
 